@@ -27,6 +27,10 @@ from __future__ import division
 
 from builtins import str
 from builtins import range
+import collections
+import concurrent.futures
+import contextlib
+import functools
 import os
 import re
 import time
@@ -40,23 +44,87 @@ import opencue
 import cuegui.Utils
 
 
+def _prefetchPages(fetch, page_size, first_page_size=None):
+    """
+    Yields successive pages of results from a paged search. The next page is
+    requested in a background thread while the caller works on the current
+    one, hiding one round trip per page.
+
+    @param fetch: Search callable accepting offset and limit keyword arguments
+    @type fetch: callable
+    @param page_size: The number of results to request per page
+    @type page_size: int
+    @param first_page_size: The number of results to request in the first
+                            page, defaults to page_size
+    @type first_page_size: int
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    size = first_page_size or page_size
+    pending = executor.submit(fetch, offset=1, limit=size)
+    offset = 1
+    try:
+        while pending is not None:
+            page = pending.result()
+            pending = None
+            if len(page) == size:
+                offset += size
+                size = page_size
+                pending = executor.submit(fetch, offset=offset, limit=size)
+            yield page
+    finally:
+        if pending is not None:
+            pending.cancel()
+        executor.shutdown(wait=False)
+
+
+# Shows and allocations rarely change. Caching these lookups lets a show
+# looked up by RedirectControls be reused by the subscription lookup in
+# RedirectWidget.redirect. ShowCombo and AllocFilter clear their cache on
+# refresh().
+@cuegui.Utils.ttlCache(15)
+def _getActiveShows():
+    return opencue.api.getActiveShows()
+
+
+@cuegui.Utils.ttlCache(15)
+def _getAllocations():
+    return opencue.api.getAllocations()
+
+
+@cuegui.Utils.ttlCache(15)
+def _findShow(name):
+    return opencue.api.findShow(name)
+
+
 class ShowCombo(QtWidgets.QComboBox):
     """
     A combo box for show selection
     """
     def __init__(self, selected="pipe", parent=None):
         QtWidgets.QComboBox.__init__(self, parent)
+        self.__index_by_name = {}
+        self.__show_by_name = {}
         self.refresh()
-        self.setCurrentIndex(self.findText(selected))
+        self.setCurrentIndex(self.indexOf(selected))
 
     def refresh(self):
         """Refreshes the show list."""
+        _getActiveShows.clear()
         self.clear()
-        shows = opencue.api.getActiveShows()
-        shows.sort(key=lambda x: x.data.name)
+        shows = sorted(_getActiveShows(), key=lambda x: x.data.name)
 
         for show in shows:
             self.addItem(show.data.name, show)
+        self.__index_by_name = dict((show.data.name, i) for i, show in enumerate(shows))
+        self.__show_by_name = dict((show.data.name, show) for show in shows)
+
+    def indexOf(self, name):
+        """Gets the index of the named show, or -1 if it is not listed."""
+        return self.__index_by_name.get(name, -1)
+
+    def getShowObj(self, name):
+        """Gets the listed show object for the named show, or None."""
+        return self.__show_by_name.get(name)
 
     def getShow(self):
         """Gets the selected show."""
@@ -84,8 +152,8 @@ class AllocFilter(QtWidgets.QPushButton):
 
     def refresh(self):
         """Refreshes the full list of allocations."""
-        allocs = opencue.api.getAllocations()
-        allocs.sort(key=lambda x: x.data.name)
+        _getAllocations.clear()
+        allocs = sorted(_getAllocations(), key=lambda x: x.data.name)
 
         self.__menu.clear()
         checked = 0
@@ -116,11 +184,8 @@ class AllocFilter(QtWidgets.QPushButton):
         """
         Build the selected set of allocations.
         """
-        selected = []
-        for item in self.__menu.actions():
-            if item.isChecked():
-                selected.append(str(item.text()))
-        self.__selected = selected
+        self.__selected = frozenset(str(item.text()) for item in self.__menu.actions()
+                                    if item.isChecked())
 
     def __afterClicked(self, action):
         """
@@ -144,13 +209,67 @@ class JobBox(QtWidgets.QLineEdit):
     def refresh(self):
         """Refreshes the list of job names."""
         slist = opencue.api.getJobNames()
-        slist.sort()
+        slist.sort(key=lambda name: name.lower())
 
-        self.__c = QtWidgets.QCompleter(slist, self)
+        # Declaring the model as case-insensitively sorted lets the completer
+        # binary search for the typed prefix instead of scanning every name.
+        self.__c = QtWidgets.QCompleter(self)
+        self.__c.setModel(QtCore.QStringListModel(slist, self.__c))
         self.__c.setCaseSensitivity(QtCore.Qt.CaseInsensitive)
+        self.__c.setModelSorting(QtWidgets.QCompleter.CaseInsensitivelySortedModel)
+        self.__c.setFilterMode(QtCore.Qt.MatchStartsWith)
         self.setCompleter(self.__c)
 
 
+class Trie(object):
+    """
+    A prefix tree mapping strings to values, used for prefix lookups.
+    """
+
+    # Key under which a node stores the value of the string ending there.
+    _VALUE = None
+
+    def __init__(self):
+        self.__root = {}
+
+    def insert(self, key, value):
+        """Stores the value under the given key."""
+        node = self.__root
+        for char in key:
+            node = node.setdefault(char, {})
+        node[Trie._VALUE] = value
+
+    def get(self, key, default=None):
+        """Returns the value stored under the given key."""
+        node = self.descend(key)
+        if node is None:
+            return default
+        return node.get(Trie._VALUE, default)
+
+    def descend(self, prefix):
+        """Returns the node reached by walking the given prefix, or None."""
+        node = self.__root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def values(self, prefix=""):
+        """Yields every value whose key starts with the given prefix."""
+        node = self.descend(prefix)
+        if node is None:
+            return
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char is Trie._VALUE:
+                    yield child
+                else:
+                    stack.append(child)
+
+
 class GroupFilter(QtWidgets.QPushButton):
     """
     A Button widget that displays a drop down menu of
@@ -159,9 +278,9 @@ class GroupFilter(QtWidgets.QPushButton):
     def __init__(self, show, name, parent=None):
         QtWidgets.QPushButton.__init__(self, name, parent)
 
+        self.__trie = Trie()
         self.__show = self.__loadShow(show)
         self.__menu = QtWidgets.QMenu(self)
-        self.__actions = { }
 
         self.setMenu(self.__menu)
 
@@ -169,7 +288,7 @@ class GroupFilter(QtWidgets.QPushButton):
 
     # pylint: disable=inconsistent-return-statements
     def __loadShow(self, show):
-        self.__actions = {}
+        self.__trie = Trie()
         # pylint: disable=bare-except
         try:
             if show:
@@ -184,19 +303,22 @@ class GroupFilter(QtWidgets.QPushButton):
     def __populate_menu(self):
         self.__menu.clear()
         for group in self.__show.getGroups():
-            if opencue.id(group) in self.__actions:
-                self.__menu.addAction(self.__actions[opencue.id(group)])
-            else:
+            action = self.__trie.get(group.data.name)
+            if action is None:
                 action = QtWidgets.QAction(self)
                 action.setText(group.data.name)
                 action.setCheckable(True)
-                self.__actions[opencue.id(group)] = action
-                self.__menu.addAction(action)
+                self.__trie.insert(group.data.name, action)
+            self.__menu.addAction(action)
 
     def getChecked(self):
         """Gets a list of action text for all selected actions."""
         return [str(action.text()) for action in
-                list(self.__actions.values()) if action.isChecked()]
+                self.__trie.values() if action.isChecked()]
+
+    def getByPrefix(self, prefix):
+        """Gets a list of the group actions whose name starts with prefix."""
+        return list(self.__trie.values(prefix))
 
 
 class RedirectControls(QtWidgets.QWidget):
@@ -206,18 +328,20 @@ class RedirectControls(QtWidgets.QWidget):
     """
     def __init__(self, parent=None):
         QtWidgets.QWidget.__init__(self, parent)
-        self.__current_show = opencue.api.findShow(os.getenv("SHOW", "pipe"))
+        self.__config = None
+        self.__current_show = _findShow(os.getenv("SHOW", "pipe"))
 
         self.__show_combo = ShowCombo(self.__current_show.data.name, self)
         self.__job_box = JobBox(self)
         self.__alloc_filter = AllocFilter(self)
 
+        cfg = self._cfg()
         self.__cores_spin = QtWidgets.QSpinBox(self)
-        self.__cores_spin.setRange(1, self._cfg().get('max_cores', 32))
+        self.__cores_spin.setRange(1, cfg.get('max_cores', 32))
         self.__cores_spin.setValue(1)
 
         self.__mem_spin = QtWidgets.QDoubleSpinBox(self)
-        self.__mem_spin.setRange(1, self._cfg().get('max_memory', 200))
+        self.__mem_spin.setRange(1, cfg.get('max_memory', 200))
         self.__mem_spin.setDecimals(1)
         self.__mem_spin.setValue(4)
         self.__mem_spin.setSuffix("GB")
@@ -227,7 +351,7 @@ class RedirectControls(QtWidgets.QWidget):
         self.__limit_spin.setValue(10)
 
         self.__prh_spin = QtWidgets.QDoubleSpinBox(self)
-        self.__prh_spin.setRange(1, self._cfg().get('max_proc_hour_cutoff', 30))
+        self.__prh_spin.setRange(1, cfg.get('max_proc_hour_cutoff', 30))
         self.__prh_spin.setDecimals(1)
         self.__prh_spin.setValue(10)
         self.__prh_spin.setSuffix("PrcHrs")
@@ -294,15 +418,15 @@ class RedirectControls(QtWidgets.QWidget):
         @return: The keys & values stored in the config file
         @rtype: dict<str:str>
         '''
-        if not hasattr(self, '__config'):
+        if self.__config is None:
             self.__config = cuegui.Utils.getResourceConfig()
         return self.__config
 
     def showChanged(self, show_index):
         """Load a new show."""
         del show_index
-        show = self.__show_combo.currentText()
-        self.__current_show = opencue.api.findShow(str(show))
+        show = str(self.__show_combo.currentText())
+        self.__current_show = self.__show_combo.getShowObj(show) or _findShow(show)
         self.__include_group_btn.showChanged(self.__current_show)
 
     def detect(self, name=None):
@@ -325,7 +449,7 @@ class RedirectControls(QtWidgets.QWidget):
 
         self.__cores_spin.setValue(int(minCores))
         self.__mem_spin.setValue(float(minMem / 1048576.0))
-        self.__show_combo.setCurrentIndex(self.__show_combo.findText(job.data.show))
+        self.__show_combo.setCurrentIndex(self.__show_combo.indexOf(job.data.show))
 
     def getJob(self):
         """Gets the current job name."""
@@ -388,6 +512,418 @@ class RedirectControls(QtWidgets.QWidget):
         return self.__include_group_btn.getChecked()
 
 
+class SearchWorker(QtCore.QThread):
+    """
+    Searches for hosts with procs that can be redirected to the target job,
+    outside of the GUI thread. Each host that satisfies the resource filters
+    is emitted through hostReady.
+    """
+
+    hostReady = QtCore.Signal(object)
+    progress = QtCore.Signal(int)
+    error = QtCore.Signal(str)
+
+    # Number of procs requested from the cuebot per search round trip.
+    PAGE_SIZE = 200
+
+    # Procs requested in the first page for each result asked for, so small
+    # searches are usually answered by a single, small response.
+    FIRST_PAGE_PROCS_PER_RESULT = 4
+
+    def __init__(self, controls, parent=None):
+        QtCore.QThread.__init__(self, parent)
+        self.__running = True
+
+        # Widgets may only be read from the GUI thread, so every search
+        # setting is copied up front.
+        self.__show_name = str(controls.getShow().data.name)
+        self.__allocs = list(controls.getAllocFilter().getSelected())
+        self.__target_job = controls.getJob()
+        self.__service_filter = controls.getRequiredService()
+        self.__group_filter = frozenset(controls.getIncludedGroups())
+        job_regex = controls.getJobNameExcludeRegex()
+        self.__job_regex_re = re.compile(job_regex) if job_regex else None
+        self.__limit = controls.getLimit()
+        self.__cores = controls.getCores()
+        self.__memory = controls.getMemory()
+        self.__cutoff = controls.getCutoffTime()
+
+    def stop(self):
+        """Stops the search."""
+        self.__running = False
+
+    def shutdown(self):
+        """Stops the search and waits for the thread to exit."""
+        self.stop()
+        self.wait()
+
+    def run(self):
+        """
+        Runs the search, emitting error with the message of any exception that
+        stops it.
+        """
+        # pylint: disable=broad-except
+        try:
+            self.__search()
+        except Exception as e:
+            self.error.emit(str(e))
+
+    def __search(self):
+        """
+        Searches the procs of the selected show, emitting hostReady for each
+        host that satisfies the resource filters.
+        """
+        hosts = { }
+        ok = 0
+        # Pages are windows over a live, sorted proc list, so a proc can show
+        # up again at the top of the next page when the list shifts.
+        seen = set()
+
+        # Local aliases keep attribute lookups out of the per-proc loops.
+        show_name = self.__show_name
+        target_job = self.__target_job
+        job_regex_re = self.__job_regex_re
+        service_filter = self.__service_filter
+        group_filter = self.__group_filter
+        limit = self.__limit
+        min_cores = self.__cores
+        min_mem = self.__memory
+        cutoff = self.__cutoff
+        now = int(time.time())
+
+        fetch = functools.partial(opencue.api.getProcs,
+                                  show=[show_name], alloc=self.__allocs)
+
+        first_page_size = min(SearchWorker.PAGE_SIZE,
+                              SearchWorker.FIRST_PAGE_PROCS_PER_RESULT * limit)
+        pages = _prefetchPages(fetch, SearchWorker.PAGE_SIZE, first_page_size)
+        with contextlib.closing(pages):
+            for procs in pages:
+                if not self.__running or ok >= limit:
+                    break
+
+                procs_by_host = collections.OrderedDict()
+                for proc in procs:
+                    d = proc.data
+                    # Stick with the target show, skip the target job and
+                    # already redirected procs, then apply the job filters
+                    # cheapest first: a set lookup, a scan of the proc's few
+                    # services, the regex.
+                    if (d.show_name != show_name
+                            or d.job_name == target_job
+                            or d.redirect_target
+                            or (group_filter and d.group_name not in group_filter)
+                            or (service_filter and service_filter not in d.services)
+                            or (job_regex_re and job_regex_re.match(d.job_name))
+                            or d.id in seen):
+                        continue
+                    seen.add(d.id)
+
+                    # The host name is the first segment of the proc name;
+                    # slicing avoids building a list per proc.
+                    full_name = d.name
+                    slash = full_name.find("/")
+                    name = full_name if slash < 0 else full_name[:slash]
+                    procs_by_host.setdefault(name, []).append(proc)
+
+                # Fetch every new candidate host in a single call rather than
+                # one findHost round trip per host.
+                cue_hosts = {}
+                needed = set(procs_by_host).difference(hosts)
+                if len(needed) > 1:
+                    cue_hosts = dict((cue_host.data.name, cue_host)
+                                     for cue_host in opencue.api.getHosts(name=list(needed)))
+
+                for name, host_procs in procs_by_host.items():
+                    if not self.__running:
+                        break
+
+                    if ok >= limit:
+                        break
+
+                    if name not in hosts:
+                        cue_host = cue_hosts.get(name)
+                        if cue_host is None:
+                            cue_host = opencue.api.findHost(name)
+                        hosts[name] = {
+                                       "host": cue_host,
+                                       "procs": [],
+                                       "mem": cue_host.data.idle_memory,
+                                       "cores": int(cue_host.data.idle_cores),
+                                       "time": 0,
+                                       "ok": False,
+                                       'alloc': cue_host.data.alloc_name}
+
+                    host = hosts[name]
+                    if host["ok"]:
+                        continue
+
+                    # Accumulate into locals and store the totals once per host.
+                    mem = host["mem"]
+                    cores = host["cores"]
+                    rtime = host["time"]
+                    for proc in host_procs:
+                        if not self.__running:
+                            break
+                        d = proc.data
+                        host["procs"].append(proc)
+                        mem += d.reserved_memory
+                        cores += d.reserved_cores
+                        rtime += now - d.dispatch_time
+                        if cores >= min_cores and mem >= min_mem and rtime < cutoff:
+                            host["ok"] = True
+                            break
+                    host["mem"] = mem
+                    host["cores"] = cores
+                    host["time"] = rtime
+
+                    if host["ok"]:
+                        ok = ok + 1
+                        self.hostReady.emit(host)
+                        self.progress.emit(ok)
+
+
+class HostProcModel(QtCore.QAbstractItemModel):
+    """
+    A two level model of the hosts found by a redirect search, with the procs
+    that can be redirected from each host as its children. Cells are formatted
+    from the raw host entries only when the view displays them. Once a host is
+    redirected its row and its proc rows are disabled.
+    """
+
+    def __init__(self, headers, parent=None):
+        QtCore.QAbstractItemModel.__init__(self, parent)
+        self.__headers = headers
+        self.__entries = []
+        self.__rows = {}
+        # Rows of the checked hosts, kept up to date as check states change so
+        # the checked hosts can be found without walking every row.
+        self.__checked_rows = set()
+        self.__redirected = set()
+
+    def clear(self):
+        """Removes every host from the model."""
+        self.beginResetModel()
+        self.__entries = []
+        self.__rows = {}
+        self.__checked_rows = set()
+        self.__redirected = set()
+        self.endResetModel()
+
+    def addHost(self, entry):
+        """
+        Appends a host and its procs to the model.
+
+        @param entry: The host and the procs that can be redirected from it
+        @type entry: dict<str:varies>
+        """
+        row = len(self.__entries)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.__entries.append(entry)
+        self.__rows[entry["host"].data.name] = row
+        self.endInsertRows()
+
+    def getCheckedHosts(self):
+        """
+        Gets the host entries that are checked.
+
+        @rtype: list<dict<str:varies>>
+        """
+        return [self.__entries[row] for row in sorted(self.__checked_rows)]
+
+    def checkAll(self):
+        """Checks every host in the model."""
+        if not self.__entries:
+            return
+        self.__checked_rows = set(range(len(self.__entries)))
+        self.dataChanged.emit(self.index(0, 0), self.index(len(self.__entries) - 1, 0))
+
+    def setRedirected(self, entry):
+        """
+        Marks a host as redirected, which disables its row and the rows of its
+        procs.
+
+        @param entry: The host entry to mark
+        @type entry: dict<str:varies>
+        """
+        name = entry["host"].data.name
+        self.__redirected.add(name)
+        row = self.__rows[name]
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+        # The proc rows are disabled along with the host.
+        if entry["procs"]:
+            host_index = self.index(row, 0)
+            self.dataChanged.emit(
+                self.index(0, 0, host_index),
+                self.index(len(entry["procs"]) - 1, self.columnCount() - 1, host_index))
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        """Returns the index of the host, or of the proc of the parent host, at
+        the given row and column
+        @type  row: int
+        @param row: The row of the item
+        @type  column: int
+        @param column: The column of the item
+        @type  parent: QtCore.QModelIndex
+        @param parent: The host index for a proc, or an invalid index for a host
+        @rtype:  QtCore.QModelIndex
+        @return: The index of the item"""
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column)
+        # Proc indexes point at the entry of the host they belong to.
+        return self.createIndex(row, column, self.__entries[parent.row()])
+
+    def parent(self, index):  # pylint: disable=arguments-differ
+        """Returns the index of the host a proc belongs to
+        @type  index: QtCore.QModelIndex
+        @param index: The index of the item
+        @rtype:  QtCore.QModelIndex
+        @return: The host index for a proc, or an invalid index for a host"""
+        if not index.isValid() or index.internalPointer() is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(self.__rows[index.internalPointer()["host"].data.name], 0)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        """Returns the number of hosts, or the number of procs of a host
+        @type  parent: QtCore.QModelIndex
+        @param parent: The host index, or an invalid index for the hosts
+        @rtype:  int
+        @return: The number of child rows"""
+        if not parent.isValid():
+            return len(self.__entries)
+        if parent.column() > 0 or parent.internalPointer() is not None:
+            return 0
+        return len(self.__entries[parent.row()]["procs"])
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        """Returns the number of columns, which is the same for every row
+        @type  parent: QtCore.QModelIndex
+        @param parent: Unused
+        @rtype:  int
+        @return: The number of columns"""
+        del parent
+        return len(self.__headers)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        """Returns the header text for the given column
+        @type  section: int
+        @param section: The column of the header
+        @type  orientation: QtCore.Qt.Orientation
+        @param orientation: The orientation of the header
+        @type  role: QtCore.Qt.ItemDataRole
+        @param role: The role being displayed
+        @rtype:  str
+        @return: The header text, or None"""
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.__headers[section]
+        return None
+
+    def flags(self, index):
+        """Returns the item flags for the given index. The rows of redirected
+        hosts and of their procs are disabled, and only hosts are checkable.
+        @type  index: QtCore.QModelIndex
+        @param index: The index of the item
+        @rtype:  QtCore.Qt.ItemFlags
+        @return: The flags of the item"""
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        entry = index.internalPointer()
+        if entry is None:
+            entry = self.__entries[index.row()]
+        flags = QtCore.Qt.ItemIsSelectable
+        if entry["host"].data.name not in self.__redirected:
+            flags |= QtCore.Qt.ItemIsEnabled
+        if index.internalPointer() is None and index.column() == 0:
+            flags |= QtCore.Qt.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """Returns the proper display data for the given index and role
+        @type  index: QtCore.QModelIndex
+        @param index: The index being displayed
+        @type  role: QtCore.Qt.ItemDataRole
+        @param role: The role being displayed
+        @rtype:  object
+        @return: The desired data"""
+        # The view asks for many roles per cell on every paint; answer the
+        # ones this model does not provide before touching any entry.
+        if role not in (QtCore.Qt.DisplayRole, QtCore.Qt.CheckStateRole,
+                        QtCore.Qt.DecorationRole) or not index.isValid():
+            return None
+        column = index.column()
+
+        entry = index.internalPointer()
+        if entry is not None:
+            proc = entry["procs"][index.row()]
+            if role == QtCore.Qt.DisplayRole:
+                return self.__procText(proc, column)
+            return None
+
+        entry = self.__entries[index.row()]
+        name = entry["host"].data.name
+        if role == QtCore.Qt.DisplayRole:
+            return self.__hostText(entry, column)
+        if role == QtCore.Qt.CheckStateRole and column == 0:
+            if index.row() in self.__checked_rows:
+                return QtCore.Qt.Checked
+            return QtCore.Qt.Unchecked
+        if role == QtCore.Qt.DecorationRole and column == 0 and name in self.__redirected:
+            return QtGui.QIcon(QtGui.QPixmap(":retry.png"))
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        """Sets the check state of a host
+        @type  index: QtCore.QModelIndex
+        @param index: The index of the host
+        @type  value: QtCore.Qt.CheckState
+        @param value: The new check state
+        @type  role: QtCore.Qt.ItemDataRole
+        @param role: Only QtCore.Qt.CheckStateRole is handled
+        @rtype:  bool
+        @return: Whether the check state was set"""
+        if role != QtCore.Qt.CheckStateRole or not index.isValid() or \
+                index.internalPointer() is not None or index.column() != 0:
+            return False
+        if value == QtCore.Qt.Checked:
+            self.__checked_rows.add(index.row())
+        else:
+            self.__checked_rows.discard(index.row())
+        self.dataChanged.emit(index, index)
+        return True
+
+    @staticmethod
+    def __hostText(entry, column):
+        if column == 0:
+            return entry["host"].data.name
+        if column == 1:
+            return str(entry["cores"])
+        if column == 2:
+            return "%0.2fGB" % (entry["mem"] / 1048576.0)
+        if column == 3:
+            # Computed from the dispatch times when shown, so the value stays
+            # current like the proc rows below it.
+            now = time.time()
+            return cuegui.Utils.secondsToHHMMSS(
+                sum(now - proc.data.dispatch_time for proc in entry["procs"]))
+        return None
+
+    @staticmethod
+    def __procText(proc, column):
+        if column == 0:
+            return proc.data.job_name
+        if column == 1:
+            return str(proc.data.reserved_cores)
+        if column == 2:
+            return "%0.2fGB" % (proc.data.reserved_memory / 1048576.0)
+        if column == 3:
+            return cuegui.Utils.secondsToHHMMSS(time.time() - proc.data.dispatch_time)
+        if column == 4:
+            return proc.data.group_name
+        return ",".join(proc.data.services)
+
+
 class RedirectWidget(QtWidgets.QWidget):
     """
     Displays a table of procs that can be selected for redirect.
@@ -397,13 +933,13 @@ class RedirectWidget(QtWidgets.QWidget):
 
     def __init__(self, parent=None):
         QtWidgets.QWidget.__init__(self, parent)
-        self.__hosts = {}
+        self.__search = None
+        self.__progress = None
+        self.__search_error = None
 
         self.__controls = RedirectControls(self)
 
-        self.__model = QtGui.QStandardItemModel(self)
-        self.__model.setColumnCount(5)
-        self.__model.setHorizontalHeaderLabels(RedirectWidget.HEADERS)
+        self.__model = HostProcModel(RedirectWidget.HEADERS, self)
 
         self.__tree = QtWidgets.QTreeView(self)
         self.__tree.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
@@ -420,13 +956,14 @@ class RedirectWidget(QtWidgets.QWidget):
         self.__controls.getClearButton().pressed.connect(self.clearTarget)
         # pylint: enable=no-member
 
-    def __get_selected_procs_by_alloc(self, selected_items):
+    @staticmethod
+    def __get_selected_procs_by_alloc(selected_hosts):
         """
         Gathers and returns the selected procs, grouped by allocation their
         allocation names
 
-        @param selected_items: The selected rows to analyze
-        @type selected_items: list<dict<str:varies>>
+        @param selected_hosts: The selected host entries to analyze
+        @type selected_hosts: list<dict<str:varies>>
 
         @return: A dictionary with the allocation names are the keys and the
                  selected procs are the values.
@@ -434,8 +971,7 @@ class RedirectWidget(QtWidgets.QWidget):
         """
 
         procs_by_alloc = {}
-        for item in selected_items:
-            entry = self.__hosts.get(str(item.text()))
+        for entry in selected_hosts:
             alloc = entry.get('alloc')
             alloc_procs = procs_by_alloc.get(alloc, [])
             alloc_procs.extend(list(entry["procs"]))
@@ -454,7 +990,7 @@ class RedirectWidget(QtWidgets.QWidget):
         message.setText(msg)
         message.exec_()
 
-    def __is_cross_show_safe(self, procs, target_show):
+    def __is_cross_show_safe(self, procs, target_show, jobs_by_name):
         """
         Determines whether or not it's safe to redirect cores from a show
         to another, based on user response to the warning message
@@ -465,13 +1001,17 @@ class RedirectWidget(QtWidgets.QWidget):
         @param target_show: The name of the target show
         @type target_show: str
 
+        @param jobs_by_name: The jobs of the procs, keyed by job name
+        @type jobs_by_name: dict<str:L{opencue.wrappers.job.Job}>
+
         @return: Whether or not it's safe to redirect the given procs to the
                  target show
         @rtype: bool
         """
 
-        xshow_jobs = [proc.getJob() for proc in procs if not
-                      proc.getJob().show() == target_show]
+        jobs = [jobs_by_name.get(proc.data.job_name) or proc.getJob()
+                for proc in procs]
+        xshow_jobs = [job for job in jobs if not job.show() == target_show]
         if not xshow_jobs:
             return True  # No cross-show procs
 
@@ -485,7 +1025,7 @@ class RedirectWidget(QtWidgets.QWidget):
                                       items=[j.name() for j
                                       in xshow_jobs])
 
-    def __is_burst_safe(self, alloc, procs, show):
+    def __is_burst_safe(self, alloc, procs, show, get_subscription):
         """
         Determines whether or not it's safe to redirect cores by checking the
         burst target show burst and the number of cores being redirected. If
@@ -502,6 +1042,10 @@ class RedirectWidget(QtWidgets.QWidget):
         @param show: The name of the target show
         @type show: str
 
+        @param get_subscription: Returns the target show's subscription to an
+                                 allocation, or None if it has none
+        @type get_subscription: callable
+
         @return: Whether or not it's safe to kill these cores based on
                  the subscription burst of the target show
         @rtype: bool
@@ -515,38 +1059,35 @@ class RedirectWidget(QtWidgets.QWidget):
         if wc_ok < 0:
             return True
 
-        show_obj = opencue.api.findShow(show)
-        show_subs = dict((s.data.name.rstrip('.%s' % show), s)
-                         for s in show_obj.getSubscriptions()
-                         if s.data.allocation_name in alloc)
-        try:
-            procs_to_burst = (show_subs.get(alloc).data.burst -
-                              show_subs.get(alloc).data.reserved_cores)
-            procs_to_redirect = int(sum([p.data.reserved_cores
-                                         for p in procs]))
-            wasted_cores = int(procs_to_redirect - procs_to_burst)
-            if wasted_cores <= wc_ok:
-                return True  # wasted cores won't exceed threshold
-
-            status = ('at burst' if procs_to_burst == 0 else
-                      '%d cores %s burst'
-                      % (procs_to_burst,
-                      'below' if procs_to_burst > 0 else  'above'))
-            msg = ('Target show\'s %s subscription is %s. Redirecting '
-                   'the selected procs will kill frames to free up %d '
-                   'cores. You will be killing %d cores '
-                   'that the target show will not be able to use. '
-                   'Do you want to redirect anyway?'
-                   % (alloc, status, int(procs_to_redirect), wasted_cores))
-            return cuegui.Utils.questionBoxYesNo(parent=self,
-                                          title=status.title(),
-                                          text=msg)
-        except TypeError:
+        subscription = get_subscription(alloc)
+        if subscription is None:
             self.__warn('Cannot direct %s cores to %s because %s the '
                         'target show does not have a %s subscription!'
                         % (alloc, show, show, alloc))
             return False
 
+        procs_to_burst = (subscription.data.burst -
+                          subscription.data.reserved_cores)
+        procs_to_redirect = int(sum([p.data.reserved_cores
+                                     for p in procs]))
+        wasted_cores = int(procs_to_redirect - procs_to_burst)
+        if wasted_cores <= wc_ok:
+            return True  # wasted cores won't exceed threshold
+
+        status = ('at burst' if procs_to_burst == 0 else
+                  '%d cores %s burst'
+                  % (procs_to_burst,
+                  'below' if procs_to_burst > 0 else  'above'))
+        msg = ('Target show\'s %s subscription is %s. Redirecting '
+               'the selected procs will kill frames to free up %d '
+               'cores. You will be killing %d cores '
+               'that the target show will not be able to use. '
+               'Do you want to redirect anyway?'
+               % (alloc, status, int(procs_to_redirect), wasted_cores))
+        return cuegui.Utils.questionBoxYesNo(parent=self,
+                                      title=status.title(),
+                                      text=msg)
+
     def redirect(self):
         """
         Redirect the selected procs to the target job, after running a few
@@ -555,12 +1096,9 @@ class RedirectWidget(QtWidgets.QWidget):
         @postcondition: The selected procs are redirected to the target job
         """
 
-        # Get selected items
-        items = [self.__model.item(row) for row
-                 in range(0, self.__model.rowCount())]
-        selected_items = [item for item in items
-                         if item.checkState() == QtCore.Qt.Checked]
-        if not selected_items:  # Nothing selected, exit
+        # Get selected hosts
+        selected_hosts = self.__model.getCheckedHosts()
+        if not selected_hosts:  # Nothing selected, exit
             self.__warn('You have not selected anything to redirect.')
             return
 
@@ -578,18 +1116,36 @@ class RedirectWidget(QtWidgets.QWidget):
             return
 
         # Gather Selected Procs
-        procs_by_alloc = self.__get_selected_procs_by_alloc(selected_items)
+        procs_by_alloc = self.__get_selected_procs_by_alloc(selected_hosts)
         show_name = job.show()
+
+        # Fetch the jobs needed by the safety checks once, rather than once
+        # per proc. Subscriptions are only fetched if a burst check needs them.
+        job_names = set(proc.data.job_name for procs in procs_by_alloc.values()
+                        for proc in procs)
+        jobs_by_name = dict((j.data.name, j)
+                            for j in opencue.api.getJobs(job=list(job_names)))
+        subs_by_alloc = []
+
+        def get_subscription(alloc):
+            """Returns the target show's subscription to alloc, or None."""
+            if not subs_by_alloc:
+                subs_by_alloc.append(dict(
+                    (s.data.allocation_name, s)
+                    for s in _findShow(show_name).getSubscriptions()))
+            return subs_by_alloc[0].get(alloc)
+
         for alloc, procs in list(procs_by_alloc.items()):
-            if not self.__is_cross_show_safe(procs, show_name):  # Cross-show
+            if not self.__is_cross_show_safe(procs, show_name,
+                                             jobs_by_name):  # Cross-show
                 return
-            if not self.__is_burst_safe(alloc, procs, show_name):  # At burst
+            if not self.__is_burst_safe(alloc, procs, show_name,
+                                        get_subscription):  # At burst
                 return
 
         # Redirect
         errors = []
-        for item in selected_items:
-            entry = self.__hosts.get(str(item.text()))
+        for entry in selected_hosts:
             procs = entry["procs"]
             # pylint: disable=broad-except
             try:
@@ -597,8 +1153,7 @@ class RedirectWidget(QtWidgets.QWidget):
                 host.redirectToJob(procs, job)
             except Exception as e:
                 errors.append(str(e))
-            item.setIcon(QtGui.QIcon(QtGui.QPixmap(":retry.png")))
-            item.setEnabled(False)
+            self.__model.setRedirected(entry)
 
         if errors:  # Something went wrong!
             self.__warn('Some procs failed to redirect.')
@@ -607,9 +1162,7 @@ class RedirectWidget(QtWidgets.QWidget):
         """
         Select all items in the results.
         """
-        for row in range(0, self.__model.rowCount()):
-            item = self.__model.item(row)
-            item.setCheckState(QtCore.Qt.Checked)
+        self.__model.checkAll()
 
     def clearTarget(self):
         """
@@ -618,109 +1171,69 @@ class RedirectWidget(QtWidgets.QWidget):
         self.__controls.getJobBox().clear()
 
     def update(self):
-        self.__model.clear()
-        self.__model.setHorizontalHeaderLabels(RedirectWidget.HEADERS)
-
-        hosts = { }
-        ok = 0
+        """
+        Searches for hosts with procs that can be redirected and lists them.
+        The search runs in a SearchWorker thread; hosts are added to the model
+        as they are found.
+        """
+        if self.__search is not None and self.__search.isRunning():
+            return
 
-        service_filter = self.__controls.getRequiredService()
-        group_filter = self.__controls.getIncludedGroups()
-        job_regex = self.__controls.getJobNameExcludeRegex()
+        if self.__search is not None:
+            # Drops the finished worker along with its connections.
+            self.__search.deleteLater()
+        search = SearchWorker(self.__controls, self)
 
-        show = self.__controls.getShow()
-        alloc = self.__controls.getAllocFilter()
-        procs = opencue.api.getProcs(show=[str(show.data.name)], alloc=alloc.getSelected())
+        self.__model.clear()
+        self.__search_error = None
 
         progress = QtWidgets.QProgressDialog("Searching","Cancel", 0,
                                          self.__controls.getLimit(), self)
         progress.setWindowModality(QtCore.Qt.WindowModal)
 
-        for proc in procs:
-            if progress.wasCanceled():
-                break
-
-            # Stick with the target show
-            if proc.data.show_name != show.data.name:
-                continue
-
-            if proc.data.job_name == str(self.__controls.getJob()):
-                continue
-
-            # Skip over already redirected procs
-            if proc.data.redirect_target:
-                continue
-
-            if ok >= self.__controls.getLimit():
-                break
-
-            if job_regex:
-                if re.match(job_regex, proc.data.job_name):
-                    continue
-
-            if service_filter:
-                if service_filter not in proc.data.services:
-                    continue
-
-            if group_filter:
-                if proc.data.group_name not in group_filter:
-                    continue
-
-            name = proc.data.name.split("/")[0]
-            if name not in hosts:
-                cue_host = opencue.api.findHost(name)
-                hosts[name] = {
-                               "host": cue_host,
-                               "procs": [],
-                               "mem": cue_host.data.idle_memory,
-                               "cores": int(cue_host.data.idle_cores),
-                               "time": 0,
-                               "ok": False,
-                               'alloc': cue_host.data.alloc_name}
-
-            host = hosts[name]
-            if host["ok"]:
-                continue
-
-            host["procs"].append(proc)
-            host["mem"] = host["mem"] + proc.data.reserved_memory
-            host["cores"] = host["cores"] + proc.data.reserved_cores
-            host["time"] = host["time"] + (int(time.time()) - proc.data.dispatch_time)
-
-            if host["cores"] >= self.__controls.getCores() and \
-                    host["mem"] >= self.__controls.getMemory() and \
-                    host["time"] < self.__controls.getCutoffTime():
-                self.__addHost(host)
-                host["ok"] = True
-                ok = ok + 1
-                progress.setValue(ok)
-
-        progress.setValue(self.__controls.getLimit())
-        # Save this for later on
-        self.__hosts = hosts
-
-    def __addHost(self, entry):
-        host = entry["host"]
-        procs = entry["procs"]
-        rtime = entry["time"]
-
-        checkbox = QtGui.QStandardItem(host.data.name)
-        checkbox.setCheckable(True)
-
-        self.__model.appendRow([checkbox,
-                               QtGui.QStandardItem(str(entry["cores"])),
-                               QtGui.QStandardItem("%0.2fGB" % (entry["mem"] / 1048576.0)),
-                               QtGui.QStandardItem(cuegui.Utils.secondsToHHMMSS(rtime))])
-
-        for proc in procs:
-            checkbox.appendRow([QtGui.QStandardItem(proc.data.job_name),
-                                QtGui.QStandardItem(str(proc.data.reserved_cores)),
-                                QtGui.QStandardItem(
-                                    "%0.2fGB" % (proc.data.reserved_memory / 1048576.0)),
-                                QtGui.QStandardItem(cuegui.Utils.secondsToHHMMSS(time.time() -
-                                                                          proc.data.dispatch_time)),
-                                QtGui.QStandardItem(proc.data.group_name),
-                                QtGui.QStandardItem(",".join(proc.data.services))])
-
-        self.__tree.setExpanded(self.__model.indexFromItem(checkbox), True)
+        # pylint: disable=no-member
+        progress.canceled.connect(search.stop)
+        search.progress.connect(progress.setValue, QtCore.Qt.QueuedConnection)
+        search.hostReady.connect(self.__onHostReady, QtCore.Qt.QueuedConnection)
+        search.error.connect(self.__onSearchError, QtCore.Qt.QueuedConnection)
+        search.finished.connect(self.__onSearchFinished, QtCore.Qt.QueuedConnection)
+        # The search thread is a child of this widget, so it has to exit
+        # before the widget is deleted or the application quits.
+        self.destroyed.connect(search.shutdown)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(search.shutdown)
+        # pylint: enable=no-member
+
+        self.__search = search
+        self.__progress = progress
+        search.start()
+
+    def __onHostReady(self, entry):
+        """
+        Adds a host found by the search to the results, expanded to show its
+        procs.
+
+        @param entry: The host entry
+        @type entry: dict
+        """
+        self.__model.addHost(entry)
+        self.__tree.expand(self.__model.index(self.__model.rowCount() - 1, 0))
+
+    def __onSearchError(self, msg):
+        """
+        Keeps the error that stopped the search, to report it once the search
+        has finished.
+
+        @param msg: The error message
+        @type msg: str
+        """
+        self.__search_error = msg
+
+    def __onSearchFinished(self):
+        """
+        Closes the progress dialog, reports any search error and lays out the
+        search results.
+        """
+        self.__progress.setValue(self.__progress.maximum())
+        if self.__search_error:
+            self.__warn('The search failed: %s' % self.__search_error)
         self.__tree.resizeColumnToContents(0)
@@ -22,6 +22,7 @@ from __future__ import division
 
 from builtins import str
 from builtins import map
+import functools
 import getpass
 import os
 import platform
@@ -325,6 +326,28 @@ def handleExceptions(function):
     return new
 
 
+def ttlCache(seconds):
+    """Decorator that caches a function's results, keyed by its positional
+    arguments, for the given number of seconds. The decorated function has a
+    clear() method that drops every cached result.
+    @type  seconds: float
+    @param seconds: How long a cached result stays valid"""
+    def decorator(function):
+        cache = {}
+
+        @functools.wraps(function)
+        def cached(*args):
+            now = time.time()
+            entry = cache.get(args)
+            if entry is None or entry[0] <= now:
+                entry = (now + seconds, function(*args))
+                cache[args] = entry
+            return entry[1]
+        cached.clear = cache.clear
+        return cached
+    return decorator
+
+
 def __splitTime(sec):
     """Takes an amount of seconds and returns a tuple for hours, minutes and seconds.
     @rtype:  tuple(int, int, int)
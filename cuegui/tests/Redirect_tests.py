@@ -22,7 +22,10 @@ import mock
 import PySide2.QtCore
 import PySide2.QtGui
 
+import opencue.compiled_proto.host_pb2
 import opencue.compiled_proto.show_pb2
+import opencue.wrappers.host
+import opencue.wrappers.proc
 import opencue.wrappers.show
 
 import cuegui.Redirect
@@ -37,6 +40,7 @@ class RedirectTests(unittest.TestCase):
     @mock.patch('opencue.cuebot.Cuebot.getStub')
     def setUp(self, getStubMock):
         test_utils.createApplication()
+        cuegui.Redirect._findShow.clear()
         PySide2.QtGui.qApp.settings = PySide2.QtCore.QSettings()
         cuegui.Style.init()
 
@@ -51,3 +55,308 @@ class RedirectTests(unittest.TestCase):
 
     def test_setup(self):
         pass
+
+    @staticmethod
+    def _job(name, show):
+        job = mock.Mock()
+        job.data.name = name
+        job.name.return_value = name
+        job.show.return_value = show
+        return job
+
+    def _checkHost(self, job_name):
+        proc = opencue.wrappers.proc.Proc(
+            opencue.compiled_proto.host_pb2.Proc(name='host1/frame', job_name=job_name,
+                                                 reserved_cores=2))
+        host = mock.Mock()
+        host.data.name = 'host1'
+        model = self.redirect._RedirectWidget__model
+        model.addHost({'host': host, 'procs': [proc], 'mem': 0, 'cores': 2, 'time': 0,
+                       'ok': True, 'alloc': 'lax.spinux'})
+        model.checkAll()
+        return host
+
+    @mock.patch('cuegui.Utils.questionBoxYesNo', return_value=False)
+    @mock.patch('opencue.api.getJobs')
+    @mock.patch('opencue.api.findJob')
+    @mock.patch('cuegui.Redirect.RedirectControls.getJob', return_value='target-job')
+    def test_redirectShouldCheckCrossShowJobFromBulkLookup(
+            self, getJobMock, findJobMock, getJobsMock, questionBoxMock):
+        del getJobMock
+        findJobMock.return_value = self._job('target-job', 'target-show')
+        getJobsMock.return_value = [self._job('other-job', 'other-show')]
+        host = self._checkHost('other-job')
+
+        with mock.patch.object(opencue.wrappers.proc.Proc, 'getJob') as procGetJobMock:
+            self.redirect.redirect()
+
+        getJobsMock.assert_called_once_with(job=['other-job'])
+        procGetJobMock.assert_not_called()
+        self.assertEqual(['other-job'], questionBoxMock.call_args[1]['items'])
+        host.redirectToJob.assert_not_called()
+
+    @mock.patch('opencue.api.findShow')
+    @mock.patch('cuegui.Utils.questionBoxYesNo')
+    @mock.patch('opencue.api.getJobs', return_value=[])
+    @mock.patch('opencue.api.findJob')
+    @mock.patch('cuegui.Redirect.RedirectControls._cfg',
+                return_value={'wasted_cores_threshold': -1})
+    @mock.patch('cuegui.Redirect.RedirectControls.getJob', return_value='target-job')
+    def test_redirectShouldFallBackToProcJob(
+            self, getJobMock, cfgMock, findJobMock, getJobsMock, questionBoxMock, findShowMock):
+        del getJobMock, cfgMock, getJobsMock
+        job = self._job('target-job', 'target-show')
+        findJobMock.return_value = job
+        host = self._checkHost('missing-job')
+
+        with mock.patch.object(opencue.wrappers.proc.Proc, 'getJob',
+                               return_value=self._job('missing-job', 'target-show')):
+            self.redirect.redirect()
+
+        questionBoxMock.assert_not_called()
+        # The burst check is disabled, so the subscriptions are never fetched.
+        findShowMock.assert_not_called()
+        host.redirectToJob.assert_called_once()
+        self.assertIs(job, host.redirectToJob.call_args[0][1])
+
+    @mock.patch('PySide2.QtWidgets.QMessageBox')
+    @mock.patch('opencue.api.findShow')
+    @mock.patch('opencue.api.getJobs')
+    @mock.patch('opencue.api.findJob')
+    @mock.patch('cuegui.Redirect.RedirectControls._cfg',
+                return_value={'wasted_cores_threshold': 100})
+    @mock.patch('cuegui.Redirect.RedirectControls.getJob', return_value='target-job')
+    def test_redirectShouldWarnWithoutSubscription(
+            self, getJobMock, cfgMock, findJobMock, getJobsMock, findShowMock, messageBoxMock):
+        del getJobMock, cfgMock
+        findJobMock.return_value = self._job('target-job', 'target-show')
+        getJobsMock.return_value = [self._job('source-job', 'target-show')]
+        subscription = mock.Mock()
+        subscription.data.allocation_name = 'other.alloc'
+        findShowMock.return_value.getSubscriptions.return_value = [subscription]
+        host = self._checkHost('source-job')
+
+        self.redirect.redirect()
+
+        findShowMock.assert_called_once_with('target-show')
+        self.assertIn('does not have a lax.spinux subscription',
+                      messageBoxMock.return_value.setText.call_args[0][0])
+        host.redirectToJob.assert_not_called()
+
+
+class PrefetchPagesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.results = list(range(1, 451))
+
+    def _fetch(self, offset, limit):
+        self.calls.append((offset, limit))
+        return self.results[offset - 1:offset - 1 + limit]
+
+    def test_shouldRequestEveryPage(self):
+        pages = list(cuegui.Redirect._prefetchPages(self._fetch, 200, 40))
+
+        self.assertEqual([40, 200, 200, 10], [len(page) for page in pages])
+        self.assertEqual(self.results, [result for page in pages for result in page])
+        self.assertEqual([(1, 40), (41, 200), (241, 200), (441, 200)], self.calls)
+
+    def test_shouldStopAfterShortPage(self):
+        self.results = list(range(1, 31))
+
+        pages = list(cuegui.Redirect._prefetchPages(self._fetch, 200, 40))
+
+        self.assertEqual([30], [len(page) for page in pages])
+        self.assertEqual([(1, 40)], self.calls)
+
+    def test_shouldStopFetchingWhenClosed(self):
+        pages = cuegui.Redirect._prefetchPages(self._fetch, 200, 40)
+
+        self.assertEqual(40, len(next(pages)))
+        pages.close()
+
+        # The prefetch of the second page may or may not have started, but
+        # nothing past it is requested.
+        self.assertIn(self.calls, ([(1, 40)], [(1, 40), (41, 200)]))
+        with self.assertRaises(StopIteration):
+            next(pages)
+
+
+@mock.patch('opencue.cuebot.Cuebot.getStub', new=mock.Mock())
+@mock.patch('time.time', new=mock.Mock(return_value=1000))
+@mock.patch('opencue.api.findHost')
+@mock.patch('opencue.api.getHosts')
+@mock.patch('opencue.api.getProcs')
+class SearchWorkerTests(unittest.TestCase):
+
+    def setUp(self):
+        test_utils.createApplication()
+        self.procs = []
+        self.controls = mock.Mock()
+        self.controls.getShow.return_value.data.name = 'testing'
+        self.controls.getAllocFilter.return_value.getSelected.return_value = \
+            frozenset(['lax.spinux'])
+        self.controls.getJob.return_value = 'target-job'
+        self.controls.getRequiredService.return_value = ''
+        self.controls.getIncludedGroups.return_value = []
+        self.controls.getJobNameExcludeRegex.return_value = ''
+        self.controls.getLimit.return_value = 10
+        self.controls.getCores.return_value = 2
+        self.controls.getMemory.return_value = 2097152
+        self.controls.getCutoffTime.return_value = 3600
+
+    def _addProc(self, host, **kwargs):
+        data = dict(id='proc%d' % len(self.procs), name='%s/frame' % host, show_name='testing',
+                    job_name='arbitrary-job', group_name='arbitrary-group',
+                    services=['arbitrary-service'], reserved_cores=1, reserved_memory=1048576,
+                    dispatch_time=900)
+        data.update(kwargs)
+        self.procs.append(opencue.wrappers.proc.Proc(opencue.compiled_proto.host_pb2.Proc(**data)))
+
+    @staticmethod
+    def _host(name):
+        return opencue.wrappers.host.Host(
+            opencue.compiled_proto.host_pb2.Host(name=name, alloc_name='lax.spinux'))
+
+    def _run(self, getProcsMock, getHostsMock, findHostMock):
+        getProcsMock.side_effect = \
+            lambda offset, limit, **_: self.procs[offset - 1:offset - 1 + limit]
+        getHostsMock.side_effect = lambda name: [self._host(n) for n in name]
+        findHostMock.side_effect = self._host
+
+        results = []
+        errors = []
+        worker = cuegui.Redirect.SearchWorker(self.controls)
+        worker.hostReady.connect(results.append)
+        worker.error.connect(errors.append)
+        worker.run()
+
+        self.assertEqual([], errors)
+        return results
+
+    def test_shouldSkipIneligibleProcs(self, getProcsMock, getHostsMock, findHostMock):
+        self.controls.getIncludedGroups.return_value = ['arbitrary-group']
+        self.controls.getRequiredService.return_value = 'arbitrary-service'
+        self.controls.getJobNameExcludeRegex.return_value = '^excluded'
+        for _ in range(2):
+            self._addProc('host1')
+            self._addProc('host2', show_name='other-show')
+            self._addProc('host3', job_name='target-job')
+            self._addProc('host4', redirect_target='another-job')
+            self._addProc('host5', group_name='other-group')
+            self._addProc('host6', services=['other-service'])
+            self._addProc('host7', job_name='excluded-job')
+
+        results = self._run(getProcsMock, getHostsMock, findHostMock)
+
+        self.assertEqual(['host1'], [entry['host'].data.name for entry in results])
+        # A single new host is looked up on its own rather than in a batch.
+        getHostsMock.assert_not_called()
+        findHostMock.assert_called_once_with('host1')
+
+    def test_shouldAccumulateUntilThresholds(self, getProcsMock, getHostsMock, findHostMock):
+        for _ in range(3):
+            self._addProc('host1')
+        self._addProc('host2')
+
+        results = self._run(getProcsMock, getHostsMock, findHostMock)
+
+        self.assertEqual(1, len(results))
+        entry = results[0]
+        self.assertEqual('host1', entry['host'].data.name)
+        self.assertTrue(entry['ok'])
+        self.assertEqual(2, len(entry['procs']))
+        self.assertEqual(2, entry['cores'])
+        self.assertEqual(2097152, entry['mem'])
+        self.assertEqual(200, entry['time'])
+
+    def test_shouldFetchNewHostsInOneCall(self, getProcsMock, getHostsMock, findHostMock):
+        for _ in range(2):
+            self._addProc('host1')
+            self._addProc('host2')
+
+        results = self._run(getProcsMock, getHostsMock, findHostMock)
+
+        self.assertEqual(['host1', 'host2'], [entry['host'].data.name for entry in results])
+        getHostsMock.assert_called_once()
+        self.assertEqual(['host1', 'host2'], sorted(getHostsMock.call_args[1]['name']))
+        findHostMock.assert_not_called()
+
+    def test_shouldStopAtLimit(self, getProcsMock, getHostsMock, findHostMock):
+        self.controls.getLimit.return_value = 1
+        for host in ('host1', 'host2', 'host3'):
+            for _ in range(2):
+                self._addProc(host)
+
+        results = self._run(getProcsMock, getHostsMock, findHostMock)
+
+        self.assertEqual(['host1'], [entry['host'].data.name for entry in results])
+        # The first page is sized from the limit.
+        self.assertEqual(mock.call(show=['testing'], alloc=['lax.spinux'], offset=1, limit=4),
+                         getProcsMock.call_args_list[0])
+
+    def test_shouldEmitError(self, getProcsMock, getHostsMock, findHostMock):
+        del getHostsMock, findHostMock
+        getProcsMock.side_effect = Exception('arbitrary error')
+
+        results = []
+        errors = []
+        worker = cuegui.Redirect.SearchWorker(self.controls)
+        worker.hostReady.connect(results.append)
+        worker.error.connect(errors.append)
+        worker.run()
+
+        self.assertEqual([], results)
+        self.assertEqual(['arbitrary error'], errors)
+
+
+@mock.patch('opencue.cuebot.Cuebot.getStub', new=mock.Mock())
+class HostProcModelTests(unittest.TestCase):
+
+    def setUp(self):
+        test_utils.createApplication()
+        self.model = cuegui.Redirect.HostProcModel(cuegui.Redirect.RedirectWidget.HEADERS)
+
+    @staticmethod
+    def _entry(name, procs):
+        host = opencue.wrappers.host.Host(opencue.compiled_proto.host_pb2.Host(name=name))
+        return {'host': host, 'procs': procs, 'mem': 1048576, 'cores': 2, 'time': 60,
+                'ok': True, 'alloc': 'lax.spinux'}
+
+    def test_addHost(self):
+        proc = opencue.wrappers.proc.Proc(
+            opencue.compiled_proto.host_pb2.Proc(job_name='arbitrary-job', reserved_cores=2))
+        self.model.addHost(self._entry('host1', [proc]))
+
+        self.assertEqual(1, self.model.rowCount())
+        hostIndex = self.model.index(0, 0)
+        self.assertEqual('host1', self.model.data(hostIndex))
+        self.assertEqual('1.00GB', self.model.data(self.model.index(0, 2)))
+        self.assertEqual(1, self.model.rowCount(hostIndex))
+        self.assertEqual('arbitrary-job', self.model.data(self.model.index(0, 0, hostIndex)))
+        self.assertEqual(hostIndex, self.model.parent(self.model.index(0, 1, hostIndex)))
+
+    def test_checkAll(self):
+        self.model.addHost(self._entry('host1', []))
+        self.model.addHost(self._entry('host2', []))
+        self.assertEqual([], self.model.getCheckedHosts())
+
+        self.model.checkAll()
+
+        self.assertEqual(['host1', 'host2'],
+                         [entry['host'].data.name for entry in self.model.getCheckedHosts()])
+
+
+class TrieTests(unittest.TestCase):
+
+    def test_getAndValues(self):
+        trie = cuegui.Redirect.Trie()
+        trie.insert('pipe_a', 1)
+        trie.insert('pipe_b', 2)
+        trie.insert('lighting', 3)
+
+        self.assertEqual(1, trie.get('pipe_a'))
+        self.assertIsNone(trie.get('pipe'))
+        self.assertEqual([1, 2], sorted(trie.values('pipe')))
+        self.assertEqual([1, 2, 3], sorted(trie.values()))
+        self.assertEqual([], list(trie.values('comp')))
@@ -69,6 +69,25 @@ class UtilsTests(unittest.TestCase):
 
         self.assertIsNone(cuegui.Utils.findJob(jobName))
 
+    @mock.patch('time.time')
+    def test_ttlCacheShouldExpire(self, timeMock):
+        function = mock.Mock(side_effect=lambda arg: arg * 2)
+        cached = cuegui.Utils.ttlCache(15)(function)
+
+        timeMock.return_value = 100
+        self.assertEqual(2, cached(1))
+        self.assertEqual(2, cached(1))
+        self.assertEqual(4, cached(2))
+        self.assertEqual(2, function.call_count)
+
+        timeMock.return_value = 115
+        self.assertEqual(2, cached(1))
+        self.assertEqual(3, function.call_count)
+
+        cached.clear()
+        self.assertEqual(4, cached(2))
+        self.assertEqual(4, function.call_count)
+
 
 if __name__ == '__main__':
     unittest.main()
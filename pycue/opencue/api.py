@@ -763,6 +763,8 @@ def getProcs(**options):
          - "gt5" is greater than 5 hours
          - "lt5" is less than 5 hours
          - "5-10" is range of 5 to 10 hours
+       - limit: the maximum number of procs to return - int
+       - offset: the 1-based index of the first proc to return - int
 
     :rtype:  list[opencue.wrapper.proc.Proc]
     :return: a list of Proc objects"""
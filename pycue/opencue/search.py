@@ -376,7 +376,12 @@ def _setOptions(criteria, options):
                 criteria.duration_range.append(
                     _createCriterion(v, int, lambda duration: (60 * 60 * duration)))
         elif k == "limit":
-            criteria.max_results = int(v)
+            if isinstance(criteria, host_pb2.ProcSearchCriteria):
+                # ProcSearchCriteria.max_results is a repeated field.
+                del criteria.max_results[:]
+                criteria.max_results.append(int(v))
+            else:
+                criteria.max_results = int(v)
         elif k == "offset":
             criteria.first_result = int(v)
         elif k == "include_finished":
@@ -71,6 +71,17 @@ class JobSearchTests(unittest.TestCase):
             job_pb2.JobGetJobsRequest(r=job_pb2.JobSearchCriteria(shows=['pipe'], substr=['v6'])),
             timeout=mock.ANY)
 
+    def testProcSearchLimitAndOffset(self, getStubMock):
+        stubMock = mock.Mock()
+        getStubMock.return_value = stubMock
+
+        opencue.search.ProcSearch.byOptions(show=['pipe'], limit=200, offset=201)
+
+        stubMock.GetProcs.assert_called_with(
+            host_pb2.ProcGetProcsRequest(r=host_pb2.ProcSearchCriteria(
+                shows=['pipe'], max_results=[200], first_result=201)),
+            timeout=mock.ANY)
+
     def testRaiseIfNotList(self, getStubMock):
         with self.assertRaises(TypeError):
             opencue.search.raiseIfNotList('user', 'iamnotalist')